@@ -1,6 +1,13 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import pyarrow as pa
+import pyarrow.compute as pc
+import importlib.util
+import inspect
+import math
+from datetime import datetime
 from io import BytesIO
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
@@ -21,15 +28,60 @@ if not uploaded_file:
     st.stop()
 
 
+# --- COLUNAS NECESSÁRIAS ---
+colunas_necessarias = [
+    "ENCONTRADAS",
+    "NÃO ENCONTRADAS",
+    "REVOGADAS",
+    "MOTIVO DA REVOGAÇÃO",
+    "ATUALIZADAS",
+    "OUTRAS SITUAÇÕES"
+]
+
+# Leitores mais rápidos: calamine para Excel quando disponível; pyarrow (dependência obrigatória) para CSV
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else None
+CSV_ENGINE = "pyarrow"
+
+
 # --- LEITURA DO ARQUIVO ---
+def read_file(file, engine=None, **kwargs) -> pd.DataFrame:
+    """Lê o arquivo CSV ou Excel a partir da linha 5"""
+    file.seek(0)
+    if file.name.endswith(".csv"):
+        if engine == "pyarrow":
+            try:
+                # O engine pyarrow ignora skiprows quando há cabeçalho; header=4 pula as 4 linhas iniciais
+                return pd.read_csv(file, header=4, engine=engine, **kwargs)
+            except (pa.ArrowInvalid, pd.errors.ParserError):
+                # Linhas com células finais omitidas: o engine padrão completa com NaN
+                file.seek(0)
+                engine = None
+        return pd.read_csv(file, skiprows=4, engine=engine, **kwargs)
+    return pd.read_excel(file, skiprows=4, engine=engine, **kwargs)
+
+
+@st.cache_data
 def load_data(file):
     """Carrega os dados do arquivo com tratamento de erros"""
     try:
         if file.name.endswith(".csv"):
-            df = pd.read_csv(file, skiprows=4, dtype=str)
+            # O engine pyarrow não aceita nrows; o cabeçalho do CSV é lido pelo engine padrão
+            engine, engine_cabecalho = CSV_ENGINE, None
         else:
-            df = pd.read_excel(file, skiprows=4, dtype=str)
-        return df
+            engine = engine_cabecalho = EXCEL_ENGINE
+
+        # Leitura apenas do cabeçalho para validar as colunas
+        cabecalho = read_file(file, engine=engine_cabecalho, nrows=0)
+        if any(col not in cabecalho.columns for col in colunas_necessarias):
+            return cabecalho
+
+        # Texto armazenado em buffers Arrow contíguos em vez de objetos str do Python
+        return read_file(
+            file,
+            dtype="string[pyarrow]",
+            usecols=colunas_necessarias,
+            engine=engine
+        )
     except Exception as e:
         st.error(f"❌ Erro ao ler o arquivo: {e}")
         return None
@@ -41,15 +93,6 @@ if df is None:
     st.stop()
 
 # --- VALIDAÇÃO DAS COLUNAS ---
-colunas_necessarias = [
-    "ENCONTRADAS",
-    "NÃO ENCONTRADAS",
-    "REVOGADAS",
-    "MOTIVO DA REVOGAÇÃO",
-    "ATUALIZADAS",
-    "OUTRAS SITUAÇÕES"
-]
-
 colunas_faltantes = [col for col in colunas_necessarias if col not in df.columns]
 if colunas_faltantes:
     st.error(f"⚠️ Colunas faltantes no arquivo: {', '.join(colunas_faltantes)}")
@@ -57,323 +100,325 @@ if colunas_faltantes:
     st.dataframe(pd.DataFrame(df.columns, columns=["Colunas Disponíveis"]), use_container_width=True)
     st.stop()
 
-# --- PREPARAÇÃO DOS DADOS ---
-df_exibicao = df.fillna("").replace("nan", "")
-
 
 # --- FUNÇÃO PARA CONTAGEM ---
-def count_filled(series: pd.Series) -> int:
-    """Conta células não vazias"""
-    return series.apply(lambda x: str(x).strip() not in ["", "nan", "None"]).sum()
-
-
-# --- CÁLCULO DOS TOTAIS ---
-totais = {}
-for col in colunas_necessarias:
-    if col != "MOTIVO DA REVOGAÇÃO":
-        totais[col] = count_filled(df[col])
-
-# --- FILTROS NA SIDEBAR ---
-st.sidebar.header("🎛️ Filtros")
-filtro = st.sidebar.selectbox(
-    "Filtrar por categoria:",
-    options=["Todos", "ENCONTRADAS", "NÃO ENCONTRADAS", "REVOGADAS", "ATUALIZADAS", "OUTRAS SITUAÇÕES"],
-    index=0
-)
+# Marcadores tratados como célula vazia
+VAZIOS = frozenset(("", "nan", "None", "NaN"))
+VALORES_VAZIOS = pa.array(sorted(VAZIOS))
 
-# --- DEFINIR COLUNAS PARA EXIBIÇÃO ---
-if filtro == "Todos":
-    colunas_grafico = [col for col in colunas_necessarias if col != "MOTIVO DA REVOGAÇÃO"]
-    colunas_tabela = list(df_exibicao.columns)
-elif filtro == "REVOGADAS":
-    colunas_grafico = ["REVOGADAS"]
-    colunas_tabela = ["REVOGADAS", "MOTIVO DA REVOGAÇÃO"]
-else:
-    colunas_grafico = [filtro]
-    colunas_tabela = [filtro]
 
-# --- MÉTRICAS PRINCIPAIS ---
-st.markdown("#### 📈 Métricas Principais")
+def filled_mask(series: pd.Series) -> pd.Series:
+    """Máscara booleana das células não vazias, calculada pelos kernels do Arrow"""
+    valores = pa.array(series.fillna("").astype("string[pyarrow]"))
+    vazias = pc.is_in(pc.utf8_trim_whitespace(valores), value_set=VALORES_VAZIOS)
+    return pd.Series(pc.invert(vazias).to_numpy(zero_copy_only=False), index=series.index)
 
-if filtro == "Todos":
-    total_geral = sum(totais.values())
-else:
-    total_geral = totais.get(filtro, 0)
 
-col1, col2, col3, col4 = st.columns(4)
+# --- PREPARAÇÃO DOS DADOS ---
+@st.cache_data
+def prepare_data(df: pd.DataFrame):
+    """Normaliza os dados e calcula a matriz de preenchimento e os totais por categoria"""
+    df_exibicao = df.fillna("").replace("nan", "")
 
-with col1:
-    st.metric("Total Filtrado", total_geral)
+    # Matriz booleana calculada uma única vez e reutilizada em todo o dashboard
+    preenchidas = df_exibicao[colunas_necessarias].apply(filled_mask)
+
+    totais = {}
+    for col in colunas_necessarias:
+        if col != "MOTIVO DA REVOGAÇÃO":
+            totais[col] = int(preenchidas[col].sum())
+
+    return df_exibicao, preenchidas, totais
 
-with col2:
-    if filtro == "Todos":
-        st.metric("Categorias", len(colunas_grafico))
-    else:
-        st.metric("Categoria Selecionada", filtro)
 
-with col3:
-    st.metric("Registros no Arquivo", len(df))
+df_exibicao, preenchidas, totais = prepare_data(df)
 
-with col4:
-    colunas_preenchidas = sum(1 for col in df.columns if count_filled(df[col]) > 0)
-    st.metric("Colunas com Dados", colunas_preenchidas)
 
 # --- GRÁFICO DONUT ---
-st.markdown("## 📊 Gráfico Visual")
+MAX_FATIAS = 8
+PIE_COLORS = px.colors.qualitative.Set3
+
+
+@st.cache_data
+def build_pie(itens: tuple):
+    """Monta o gráfico de todas as categorias, agrupando a cauda em 'Outros'"""
+    if len(itens) > MAX_FATIAS:
+        # Ordena só quando precisa cortar; assim cada categoria mantém sua cor entre uploads
+        itens = sorted(itens, key=lambda item: item[1], reverse=True)
+        itens = itens[:MAX_FATIAS - 1] + [("Outros", sum(q for _, q in itens[MAX_FATIAS - 1:]))]
+
+    df_grafico = pd.DataFrame(itens, columns=["Categoria", "Quantidade"])
+    fig = px.pie(
+        df_grafico,
+        names="Categoria",
+        values="Quantidade",
+        title="Situação dos dados NotebookLM MB",
+        hole=0.4,
+        color_discrete_sequence=PIE_COLORS
+    )
+    fig.update_traces(textinfo='percent+label', textfont_size=13)
+    return fig
+
+
+@st.cache_data
+def build_pie_categoria(filtro: str, quantidade: int, total_registros: int):
+    """Monta o gráfico de uma categoria específica contra o restante dos registros"""
+    fig = px.pie(
+        names=[filtro, "Outros"],
+        values=[quantidade, max(0, total_registros - quantidade)],
+        title=f"Distribuição: {filtro}",
+        hole=0.4
+    )
+    fig.update_traces(textinfo='value+percent', textfont_size=13)
+    return fig
+
+
+# --- CONTAINERS PARA TODAS AS CATEGORIAS ---
+CARD_TEMPLATE = """
+<div style="
+    border: 1px solid {borda};
+    border-radius: 8px;
+    padding: 8px 12px;
+    margin: 6px 0;
+    background-color: {fundo};
+    box-shadow: 0 1px 2px rgba(0,0,0,0.1);
+    font-size: 14px;
+">
+    <strong style="color: {cor}; font-size: 15px;">{emoji} {item}</strong>
+</div>
+"""
+
+
+# Expanders com estado (Streamlit recente) informam via .open se estão abertos
+EXPANDER_COM_ESTADO = "on_change" in inspect.signature(st.expander).parameters
+
+
+def expander(titulo: str, chave: str):
+    """Cria um expander fechado, com rastreamento de estado quando o Streamlit suporta"""
+    if EXPANDER_COM_ESTADO:
+        return st.expander(titulo, expanded=False, key=f"expander_{chave}", on_change="rerun")
+    return st.expander(titulo, expanded=False)
+
+
+def expander_aberto(container) -> bool:
+    """Indica se o conteúdo deve ser montado; sem rastreamento de estado, sempre monta"""
+    return getattr(container, "open", None) is not False
+
+
+ITENS_POR_PAGINA = 50
+
+
+def paginar(itens, chave: str):
+    """Retorna apenas a página selecionada da lista, evitando renderizar todos os itens"""
+    paginas = max(1, math.ceil(len(itens) / ITENS_POR_PAGINA))
+    if paginas == 1:
+        return itens
+
+    pagina = st.number_input("Página", min_value=1, max_value=paginas, value=1, step=1, key=f"pagina_{chave}")
+    st.caption(f"Página {pagina} de {paginas} ({ITENS_POR_PAGINA} itens por página)")
+    inicio = (pagina - 1) * ITENS_POR_PAGINA
+    return itens[inicio:inicio + ITENS_POR_PAGINA]
+
+
+def cards_html(itens, emoji: str, borda: str, fundo: str, cor: str) -> str:
+    """Monta o HTML de todos os cards de uma lista de uma só vez"""
+    return "".join(
+        CARD_TEMPLATE.format(borda=borda, fundo=fundo, cor=cor, emoji=emoji, item=item)
+        for item in itens
+    )
+
+
+def render_list(col: str, titulo: str, emoji: str, borda: str, fundo: str, cor: str):
+    """Exibe os itens preenchidos de uma categoria em um expander paginado"""
+    itens = df_exibicao[col].to_numpy()[preenchidas[col].to_numpy()]
+
+    container = expander(titulo, col)
+    with container:
+        st.markdown(f"### 📊 Total: {len(itens)} itens")
+        # Os cards só são montados e enviados com o expander aberto
+        if expander_aberto(container):
+            pagina = paginar(itens, col)
+            st.markdown(cards_html(pagina, emoji, borda, fundo, cor), unsafe_allow_html=True)
+
+
+# Coluna, título do expander, emoji e cores (borda, fundo, texto) de cada lista
+CATEGORIAS = [
+    ("ENCONTRADAS", "✅ Itens Encontrados", "✅", "#d4edda", "#f8fff9", "#155724"),
+    ("NÃO ENCONTRADAS", "❌ Itens Não Encontrados", "❌", "#f8d7da", "#fff5f5", "#721c24"),
+    ("ATUALIZADAS", "🔄 Itens Atualizados", "🔄", "#cce7ff", "#f0f8ff", "#004085"),
+    ("OUTRAS SITUAÇÕES", "📝 Outras Situações", "📝", "#e6e6e6", "#fafafa", "#666"),
+]
+
+
+# --- DOWNLOAD DA PLANILHA PROCESSADA ---
+@st.cache_data
+def build_xlsx(dados_exportar: pd.DataFrame, filtro: str, total_registros: int) -> bytes:
+    """Gera o Excel exportado; fica em cache para não ser refeito a cada interação"""
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter', engine_kwargs={"options": {"strings_to_urls": False}}) as writer:
+        dados_exportar.to_excel(writer, index=False, sheet_name="Dados Filtrados")
+
+        # Adicionar aba com métricas
+        metricas_df = pd.DataFrame({
+            'Métrica': ['Total de Registros', 'Categoria Filtrada', 'Registros no Filtro'],
+            'Valor': [total_registros, filtro, len(dados_exportar)]
+        })
+        metricas_df.to_excel(writer, index=False, sheet_name="Métricas")
+
+    return output.getvalue()
+
+
+@st.cache_data
+def build_csv(dados_exportar: pd.DataFrame) -> bytes:
+    """Gera o CSV exportado; fica em cache para não ser refeito a cada interação"""
+    return dados_exportar.to_csv(index=False).encode("utf-8-sig")
+
+
+# --- CONTEÚDO FILTRADO ---
+# st.fragment (Streamlit 1.33+) faz a troca de filtro reexecutar só esta parte da página
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
 
-if total_geral > 0:
+
+@fragment
+def render_filtrado():
+    """Exibe métricas, gráfico, listas, tabela e exportação conforme o filtro selecionado"""
+    # --- FILTROS ---
+    filtro = st.selectbox(
+        "🎛️ Filtrar por categoria:",
+        options=["Todos", "ENCONTRADAS", "NÃO ENCONTRADAS", "REVOGADAS", "ATUALIZADAS", "OUTRAS SITUAÇÕES"],
+        index=0
+    )
+
+    # --- DEFINIR COLUNAS PARA EXIBIÇÃO ---
     if filtro == "Todos":
-        # Gráfico para todas as categorias
-        dados_grafico = []
-        for categoria, quantidade in totais.items():
-            if quantidade > 0:
-                dados_grafico.append({"Categoria": categoria, "Quantidade": quantidade})
-
-        if dados_grafico:
-            df_grafico = pd.DataFrame(dados_grafico)
-            fig = px.pie(
-                df_grafico,
-                names="Categoria",
-                values="Quantidade",
-                title="Situação dos dados NotebookLM MB",
-                hole=0.4,
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig.update_traces(textinfo='percent+label', textfont_size=13)
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning("Não há dados para exibir no gráfico.")
+        colunas_grafico = [col for col in colunas_necessarias if col != "MOTIVO DA REVOGAÇÃO"]
+        colunas_tabela = list(df_exibicao.columns)
+    elif filtro == "REVOGADAS":
+        colunas_grafico = ["REVOGADAS"]
+        colunas_tabela = ["REVOGADAS", "MOTIVO DA REVOGAÇÃO"]
     else:
-        # Gráfico para categoria específica
-        quantidade = totais.get(filtro, 0)
-        if quantidade > 0:
-            fig = px.pie(
-                names=[filtro, "Outros"],
-                values=[quantidade, max(0, len(df) - quantidade)],
-                title=f"Distribuição: {filtro}",
-                hole=0.4
-            )
-            fig.update_traces(textinfo='value+percent', textfont_size=13)
-            st.plotly_chart(fig, use_container_width=True)
+        colunas_grafico = [filtro]
+        colunas_tabela = [filtro]
+
+    # --- MÉTRICAS PRINCIPAIS ---
+    st.markdown("#### 📈 Métricas Principais")
+
+    if filtro == "Todos":
+        total_geral = sum(totais.values())
+    else:
+        total_geral = totais.get(filtro, 0)
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Total Filtrado", total_geral)
+
+    with col2:
+        if filtro == "Todos":
+            st.metric("Categorias", len(colunas_grafico))
         else:
-            st.info(f"Não há registros na categoria '{filtro}'.")
-else:
-    st.warning("Não há dados para exibir com os filtros atuais.")
+            st.metric("Categoria Selecionada", filtro)
 
-# --- CONTAINERS PARA TODAS AS CATEGORIAS ---
+    with col3:
+        st.metric("Registros no Arquivo", len(df))
 
-# Container para ENCONTRADAS
-if (filtro == "ENCONTRADAS" or filtro == "Todos") and totais["ENCONTRADAS"] > 0:
-    encontradas_filtradas = df_exibicao[df_exibicao["ENCONTRADAS"].apply(
-        lambda x: str(x).strip() not in ["", "nan", "None"]
-    )]
-
-    if not encontradas_filtradas.empty:
-        with st.expander("✅ Itens Encontrados", expanded=False):
-            st.markdown(f"### 📊 Total: {len(encontradas_filtradas)} itens")
-
-            for idx, row in encontradas_filtradas.iterrows():
-                encontrada = row["ENCONTRADAS"]
-
-                with st.container():
-                    st.markdown(
-                        f"""
-                        <div style="
-                            border: 1px solid #d4edda;
-                            border-radius: 8px;
-                            padding: 8px 12px;
-                            margin: 6px 0;
-                            background-color: #f8fff9;
-                            box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-                            font-size: 14px;
-                        ">
-                            <strong style="color: #155724; font-size: 15px;">✅ {encontrada}</strong>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
+    with col4:
+        # df contém apenas as colunas necessárias, todas presentes na matriz de preenchimento
+        colunas_preenchidas = int(preenchidas.any().sum())
+        st.metric("Colunas com Dados", colunas_preenchidas)
 
-# Container para NÃO ENCONTRADAS
-if (filtro == "NÃO ENCONTRADAS" or filtro == "Todos") and totais["NÃO ENCONTRADAS"] > 0:
-    nao_encontradas_filtradas = df_exibicao[df_exibicao["NÃO ENCONTRADAS"].apply(
-        lambda x: str(x).strip() not in ["", "nan", "None"]
-    )]
-
-    if not nao_encontradas_filtradas.empty:
-        with st.expander("❌ Itens Não Encontrados", expanded=False):
-            st.markdown(f"### 📊 Total: {len(nao_encontradas_filtradas)} itens")
-
-            for idx, row in nao_encontradas_filtradas.iterrows():
-                nao_encontrada = row["NÃO ENCONTRADAS"]
-
-                with st.container():
-                    st.markdown(
-                        f"""
-                        <div style="
-                            border: 1px solid #f8d7da;
-                            border-radius: 8px;
-                            padding: 8px 12px;
-                            margin: 6px 0;
-                            background-color: #fff5f5;
-                            box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-                            font-size: 14px;
-                        ">
-                            <strong style="color: #721c24; font-size: 15px;">❌ {nao_encontrada}</strong>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
+    # --- GRÁFICO DONUT ---
+    st.markdown("## 📊 Gráfico Visual")
 
-# Container para ATUALIZADAS
-if (filtro == "ATUALIZADAS" or filtro == "Todos") and totais["ATUALIZADAS"] > 0:
-    atualizadas_filtradas = df_exibicao[df_exibicao["ATUALIZADAS"].apply(
-        lambda x: str(x).strip() not in ["", "nan", "None"]
-    )]
-
-    if not atualizadas_filtradas.empty:
-        with st.expander("🔄 Itens Atualizados", expanded=False):
-            st.markdown(f"### 📊 Total: {len(atualizadas_filtradas)} itens")
-
-            for idx, row in atualizadas_filtradas.iterrows():
-                atualizada = row["ATUALIZADAS"]
-
-                with st.container():
-                    st.markdown(
-                        f"""
-                        <div style="
-                            border: 1px solid #cce7ff;
-                            border-radius: 8px;
-                            padding: 8px 12px;
-                            margin: 6px 0;
-                            background-color: #f0f8ff;
-                            box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-                            font-size: 14px;
-                        ">
-                            <strong style="color: #004085; font-size: 15px;">🔄 {atualizada}</strong>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
+    if total_geral > 0:
+        if filtro == "Todos":
+            # Gráfico para todas as categorias
+            dados_grafico = tuple(
+                (categoria, quantidade) for categoria, quantidade in totais.items() if quantidade > 0
+            )
 
-# Container para OUTRAS SITUAÇÕES
-if (filtro == "OUTRAS SITUAÇÕES" or filtro == "Todos") and totais["OUTRAS SITUAÇÕES"] > 0:
-    outras_filtradas = df_exibicao[df_exibicao["OUTRAS SITUAÇÕES"].apply(
-        lambda x: str(x).strip() not in ["", "nan", "None"]
-    )]
-
-    if not outras_filtradas.empty:
-        with st.expander("📝 Outras Situações", expanded=False):
-            st.markdown(f"### 📊 Total: {len(outras_filtradas)} itens")
-
-            for idx, row in outras_filtradas.iterrows():
-                outra = row["OUTRAS SITUAÇÕES"]
-
-                with st.container():
-                    st.markdown(
-                        f"""
-                        <div style="
-                            border: 1px solid #e6e6e6;
-                            border-radius: 8px;
-                            padding: 8px 12px;
-                            margin: 6px 0;
-                            background-color: #fafafa;
-                            box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-                            font-size: 14px;
-                        ">
-                            <strong style="color: #666; font-size: 15px;">📝 {outra}</strong>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
+            if dados_grafico:
+                st.plotly_chart(build_pie(dados_grafico), use_container_width=True)
+            else:
+                st.warning("Não há dados para exibir no gráfico.")
+        else:
+            # Gráfico para categoria específica
+            quantidade = totais.get(filtro, 0)
+            if quantidade > 0:
+                st.plotly_chart(build_pie_categoria(filtro, quantidade, len(df)), use_container_width=True)
+            else:
+                st.info(f"Não há registros na categoria '{filtro}'.")
+    else:
+        st.warning("Não há dados para exibir com os filtros atuais.")
+
+    # --- CONTAINERS PARA TODAS AS CATEGORIAS ---
+    for col, titulo, emoji, borda, fundo, cor in CATEGORIAS:
+        if filtro in ("Todos", col) and totais[col] > 0:
+            render_list(col, titulo, emoji, borda, fundo, cor)
+
+    # --- CONTAINER EXPANSÍVEL COM LISTA DE REVOGAÇÕES ---
+    if (filtro == "REVOGADAS" or filtro == "Todos") and totais["REVOGADAS"] > 0:
+        # Arrays posicionais: evita montar o DataFrame filtrado e as buscas por rótulo
+        mascara = preenchidas["REVOGADAS"].to_numpy()
+        revogadas = df_exibicao["REVOGADAS"].to_numpy()[mascara]
+        motivos = df_exibicao["MOTIVO DA REVOGAÇÃO"].to_numpy()[mascara]
+        tem_motivo = preenchidas["MOTIVO DA REVOGAÇÃO"].to_numpy()[mascara]
+
+        if len(revogadas) > 0:
+            container = expander("🔴 Revogações e Motivos", "revogadas")
+            with container:
+                st.markdown(f"### 📊 Total: {len(revogadas)} revogações")
+
+                # A tabela só é montada e enviada com o expander aberto
+                if expander_aberto(container):
+                    # Tabela virtualizada: o navegador só desenha as linhas visíveis
+                    tabela_revogacoes = pd.DataFrame({
+                        "Status": np.where(tem_motivo, "✅", "❓ sem motivo"),
+                        "REVOGADAS": revogadas,
+                        "MOTIVO DA REVOGAÇÃO": np.where(tem_motivo, motivos, "Motivo não informado")
+                    })
+                    st.dataframe(
+                        tabela_revogacoes,
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={
+                            "Status": st.column_config.TextColumn("Status", width="small"),
+                            "REVOGADAS": st.column_config.TextColumn("🔴 Revogada", width="medium"),
+                            "MOTIVO DA REVOGAÇÃO": st.column_config.TextColumn("Motivo", width="large")
+                        }
                     )
 
-# --- CONTAINER EXPANSÍVEL COM LISTA DE REVOGAÇÕES ---
-if (filtro == "REVOGADAS" or filtro == "Todos") and totais["REVOGADAS"] > 0:
-    revogadas_filtradas = df_exibicao[df_exibicao["REVOGADAS"].apply(
-        lambda x: str(x).strip() not in ["", "nan", "None"]
-    )]
-
-    if not revogadas_filtradas.empty:
-        with st.expander("🔴 Revogações e Motivos", expanded=False):
-            st.markdown(f"### 📊 Total: {len(revogadas_filtradas)} revogações")
-
-            # Criar lista de revogações com motivos
-            for idx, row in revogadas_filtradas.iterrows():
-                revogada = row["REVOGADAS"]
-                motivo = row["MOTIVO DA REVOGAÇÃO"]
-
-                # Verificar se o motivo está vazio
-                if str(motivo).strip() in ["", "nan", "None"]:
-                    motivo_exibicao = "❓ *Motivo não informado*"
-                    cor_borda = "#ffcccc"
-                else:
-                    motivo_exibicao = motivo
-                    cor_borda = "#e6f3ff"
-
-                # Container para cada item da lista
-                with st.container():
-                    st.markdown(
-                        f"""
-                        <div style="
-                            border: 1px solid {cor_borda};
-                            border-radius: 8px;
-                            padding: 8px 12px;
-                            margin: 6px 0;
-                            background-color: #fafafa;
-                            box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-                            font-size: 14px;
-                        ">
-                            <div style="display: flex; justify-content: space-between; align-items: center;">
-                                <div style="flex: 1;">
-                                    <strong style="color: #333; font-size: 15px;">🔴 {revogada}</strong>
-                                </div>
-                                <div style="flex: 2; margin-left: 15px;">
-                                    <span style="color: #666; font-size: 15px;"><strong>Motivo:</strong> {motivo_exibicao}</span>
-                                </div>
-                            </div>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
+                    # Estatísticas rápidas
+                    total_revogadas = len(revogadas)
+                    com_motivo = int(tem_motivo.sum())
+                    sem_motivo = total_revogadas - com_motivo
+
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Total", total_revogadas)
+                    with col2:
+                        st.metric("Com Motivo", com_motivo)
+                    with col3:
+                        st.metric("Sem Motivo", sem_motivo)
+
+    # --- TABELA INTERATIVA (AGORA NO FINAL) ---
+    st.markdown("## 📄 Tabela Completa de Dados")
 
-            # Estatísticas rápidas
-            total_revogadas = len(revogadas_filtradas)
-            com_motivo = revogadas_filtradas["MOTIVO DA REVOGAÇÃO"].apply(
-                lambda x: str(x).strip() not in ["", "nan", "None"]
-            ).sum()
-            sem_motivo = total_revogadas - com_motivo
-
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total", total_revogadas)
-            with col2:
-                st.metric("Com Motivo", com_motivo)
-            with col3:
-                st.metric("Sem Motivo", sem_motivo)
-
-# --- TABELA INTERATIVA (AGORA NO FINAL) ---
-st.markdown("## 📄 Tabela Completa de Dados")
-
-if filtro == "Todos":
-    st.dataframe(df_exibicao, use_container_width=True)
-    st.caption(f"Mostrando todos os {len(df_exibicao)} registros do arquivo")
-else:
-    # Filtrar apenas linhas que têm dados na coluna selecionada
-    df_filtrado = df_exibicao[df_exibicao[filtro].apply(
-        lambda x: str(x).strip() not in ["", "nan", "None"]
-    )]
-
-    if not df_filtrado.empty:
+    if filtro == "Todos":
+        st.dataframe(df_exibicao, use_container_width=True)
+        st.caption(f"Mostrando todos os {len(df_exibicao)} registros do arquivo")
+    elif totais.get(filtro, 0) == 0:
+        # Categoria vazia: não há o que filtrar
+        st.info(f"Nenhum registro encontrado com dados em '{filtro}'")
+    else:
+        # Filtrar apenas linhas que têm dados na coluna selecionada
+        df_filtrado = df_exibicao[preenchidas[filtro]]
         st.dataframe(df_filtrado[colunas_tabela], use_container_width=True)
         st.caption(f"Mostrando {len(df_filtrado)} registros com dados em '{filtro}'")
-    else:
-        st.info(f"Nenhum registro encontrado com dados em '{filtro}'")
-
-# --- DOWNLOAD DA PLANILHA PROCESSADA ---
-st.markdown("## 💾 Exportar Dados")
 
-col1, col2 = st.columns(2)
+    # --- DOWNLOAD DA PLANILHA PROCESSADA ---
+    st.markdown("## 💾 Exportar Dados")
 
-with col1:
     # Download dos dados filtrados
     if filtro == "Todos":
         dados_exportar = df_exibicao
@@ -381,57 +426,67 @@ with col1:
         dados_exportar = df_filtrado[colunas_tabela] if 'df_filtrado' in locals() and not df_filtrado.empty else \
         df_exibicao[colunas_tabela]
 
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        dados_exportar.to_excel(writer, index=False, sheet_name="Dados Filtrados")
+    nome_arquivo = f"dados_processados_{filtro.lower().replace(' ', '_')}"
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # CSV como caminho padrão: muito mais rápido de gerar que o XLSX
+        st.download_button(
+            label="⬇️ Baixar CSV Processado",
+            data=build_csv(dados_exportar),
+            file_name=f"{nome_arquivo}.csv",
+            mime="text/csv",
+            help="Baixe os dados filtrados em formato CSV (abre direto no Excel)"
+        )
+
+    with col2:
+        # O XLSX só é gerado quando solicitado
+        if st.button("📗 Gerar Excel Processado"):
+            st.download_button(
+                label="⬇️ Baixar Excel Processado",
+                data=build_xlsx(dados_exportar, filtro, len(df)),
+                file_name=f"{nome_arquivo}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                help="Baixe os dados filtrados em formato Excel",
+                # Sem rerun ao baixar, o botão continua visível após o download
+                on_click="ignore"
+            )
 
-        # Adicionar aba com métricas
-        metricas_df = pd.DataFrame({
-            'Métrica': ['Total de Registros', 'Categoria Filtrada', 'Registros no Filtro'],
-            'Valor': [len(df), filtro, len(dados_exportar)]
-        })
-        metricas_df.to_excel(writer, index=False, sheet_name="Métricas")
+    #with col2:
+        # Download do resumo estatístico
+    #    if st.button("📊 Gerar Relatório de Resumo"):
+    #        resumo = []
+    #        for categoria, quantidade in totais.items():
+    #            if quantidade > 0:
+    #                percentual = (quantidade / len(df)) * 100
+    #                resumo.append({
+    #                    'Categoria': categoria,
+    #                    'Quantidade': quantidade,
+    #                    'Percentual (%)': f"{percentual:.1f}%"
+    #                })
 
-    processed_data = output.getvalue()
+    #        resumo_df = pd.DataFrame(resumo)
+    #        st.dataframe(resumo_df, use_container_width=True)
 
-    st.download_button(
-        label="⬇️ Baixar Excel Processado",
-        data=processed_data,
-        file_name=f"dados_processados_{filtro.lower().replace(' ', '_')}.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        help="Baixe os dados filtrados em formato Excel"
-    )
 
-#with col2:
-    # Download do resumo estatístico
-#    if st.button("📊 Gerar Relatório de Resumo"):
-#        resumo = []
-#        for categoria, quantidade in totais.items():
-#            if quantidade > 0:
-#                percentual = (quantidade / len(df)) * 100
-#                resumo.append({
-#                    'Categoria': categoria,
-#                    'Quantidade': quantidade,
-#                    'Percentual (%)': f"{percentual:.1f}%"
-#                })
-
-#        resumo_df = pd.DataFrame(resumo)
-#        st.dataframe(resumo_df, use_container_width=True)
+render_filtrado()
 
 # --- INFORMAÇÕES ADICIONAIS ---
 with st.expander("ℹ️ Informações sobre a Análise"):
     st.markdown("""
     **Como usar este dashboard:**
     - Faça upload de uma planilha CSV ou Excel com as colunas específicas
-    - Use o filtro lateral para focar em categorias específicas
+    - Apenas as seis colunas da análise são carregadas; as demais colunas da planilha não aparecem na tabela nem na exportação
+    - Use o filtro de categoria para focar em categorias específicas
     - Visualize a distribuição através dos gráficos
     - Expanda as seções abaixo para ver os detalhes de cada categoria
     - Analise os dados completos na tabela no final
-    - Exporte os resultados para Excel
+    - Exporte os resultados em CSV ou Excel
     """)
 
 st.caption(
-    f"Arquivo carregado: {uploaded_file.name} | Última atualização: {pd.Timestamp.now().strftime('%d/%m/%Y %H:%M')}")
+    f"Arquivo carregado: {uploaded_file.name} | Última atualização: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
 
 
 